@@ -1,18 +1,442 @@
 import paho.mqtt.client as mqtt
-import json
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+import orjson
+import atexit
+import functools
 import logging
+import queue
 import time
 import random
+import selectors
+import socket
+import struct
 import threading
+from array import array
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, Any, Optional
 
+# Leading bytes that can start a JSON document, and JSON whitespace
+_JSON_LEAD = frozenset(b'{["tfn0123456789-')
+_JSON_WHITESPACE = frozenset(b' \t\n\r')
+
+# Batch publishing limits
+BATCH_MAX_SIZE = 50
+BATCH_MAX_DELAY = 1.0
+
+# Publications waiting for the publish worker before callers block
+PUBLISH_QUEUE_SIZE = 1024
+
+# Binary sensor reading layout: sensor id, value, timestamp
+READING_STRUCT = struct.Struct('<Bdd')
+SENSOR_IDS = {'temperature': 0, 'humidity': 1, 'pressure': 2}
+
+def _configure_logging() -> QueueListener:
+    """
+    Route log records through a queue so handler I/O runs on a
+    listener thread instead of the paho network thread
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s: %(message)s'))
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(message)s',
+        handlers=[QueueHandler(log_queue)]
+    )
+    
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+# Logging is configured once at import and shared by every client
+_LOG_LISTENER = _configure_logging()
+_LOGGER = logging.getLogger(__name__)
+
+def encode_varint(value: int) -> bytes:
+    """
+    Encode an integer as an MQTT variable byte integer
+    (7 bits per byte, high bit set while more bytes follow)
+    """
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def decode_batch(frame: bytes) -> list:
+    """
+    Split a batch payload back into its length-prefixed sub-payloads
+    
+    Raises:
+        ValueError: If the frame is truncated or a length prefix is malformed
+    """
+    payloads = []
+    pos = 0
+    size = len(frame)
+    while pos < size:
+        length = 0
+        shift = 0
+        while True:
+            if pos >= size:
+                raise ValueError("Batch frame truncated inside a length prefix")
+            if shift > 21:
+                raise ValueError("Batch length prefix longer than 4 bytes")
+            byte = frame[pos]
+            pos += 1
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        if pos + length > size:
+            raise ValueError(
+                f"Batch frame truncated: sub-payload needs {length} bytes, {size - pos} left"
+            )
+        payloads.append(frame[pos:pos + length])
+        pos += length
+    return payloads
+
+def _decode_text(payload: bytes):
+    """
+    Decode a non-JSON payload as UTF-8 text, keeping binary payloads as bytes
+    """
+    try:
+        return payload.decode('utf-8')
+    except UnicodeDecodeError:
+        return bytes(payload)
+
+# JSON encoder for publishing; like json.dumps, accept non-str dict keys
+_dumps_json = functools.partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+
+def _encode_other(message: Any) -> bytes:
+    """
+    Encode payload types not listed in _PUBLISH_ENCODERS, including
+    subclasses of the listed ones
+    """
+    if isinstance(message, (dict, list)):
+        return _dumps_json(message)
+    if isinstance(message, (bytes, bytearray)):
+        return bytes(message)
+    return str(message).encode('utf-8')
+
+# Payload encoders for publish(), keyed by exact type
+_PUBLISH_ENCODERS = {
+    dict: _dumps_json,
+    list: _dumps_json,
+    bytes: bytes,
+    bytearray: bytes,
+    str: str.encode
+}
+
+def unpack_reading(payload: bytes) -> dict:
+    """
+    Decode a binary sensor reading produced by the simulation
+    """
+    sensor_id, value, timestamp = READING_STRUCT.unpack_from(payload)
+    return {'sensor_id': sensor_id, 'value': value, 'timestamp': timestamp}
+
+class TopicRing:
+    """
+    Fixed-capacity message ring for a single topic
+
+    Payloads and receive timestamps are kept in parallel arrays, the
+    timestamps packed as C doubles. The paho network thread is the only
+    producer and the caller of get_messages the only consumer, so no lock
+    is needed. Up to capacity - 1 messages are retained; beyond that the
+    oldest are overwritten and counted as dropped.
+    """
+    __slots__ = ('payloads', 'timestamps', 'mask', 'head', 'tail', 'dropped')
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity (int): Ring size, must be a power of two
+        """
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("Ring capacity must be a power of two")
+        self.payloads = [None] * capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.mask = capacity - 1
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+
+    def push(self, payload, timestamp: float):
+        """
+        Append a message, overwriting the oldest one on overflow
+        """
+        idx = self.tail & self.mask
+        self.payloads[idx] = payload
+        self.timestamps[idx] = timestamp
+        self.tail += 1
+
+    def drain(self, clear: bool = True) -> list:
+        """
+        Return buffered (payload, timestamp) pairs in arrival order
+
+        Args:
+            clear (bool): Advance past the returned messages
+        """
+        tail = self.tail
+        head = self.head
+        capacity = self.mask + 1
+        
+        # The slot of message tail - capacity may be mid-overwrite by the
+        # next push, so at most capacity - 1 messages are readable
+        oldest = tail - capacity + 1
+        if head < oldest:
+            if clear:
+                self.dropped += oldest - head
+            head = oldest
+        
+        start = head & self.mask
+        end = start + (tail - head)
+        if end <= capacity:
+            payloads = self.payloads[start:end]
+            timestamps = self.timestamps[start:end]
+        else:
+            end -= capacity
+            payloads = self.payloads[start:] + self.payloads[:end]
+            timestamps = self.timestamps[start:] + self.timestamps[:end]
+        
+        # Discard anything the producer overwrote while we were copying,
+        # which could otherwise pair one message's payload with another's
+        # timestamp
+        torn = min(self.tail - capacity + 1 - head, tail - head)
+        if torn > 0:
+            if clear:
+                self.dropped += torn
+            payloads = payloads[torn:]
+            timestamps = timestamps[torn:]
+        
+        if clear:
+            self.head = tail
+        return list(zip(payloads, timestamps))
+
+class SharedNetworkLoop:
+    """
+    One background thread driving network I/O for many MQTT clients
+
+    Uses paho's external event loop API (loop_read/loop_write/loop_misc),
+    so every registered client is serviced by a single selector
+    instead of a loop_start() thread per client. All socket writes happen
+    on the loop thread: registered clients queue outgoing packets and wake
+    the loop rather than writing inline. Clients are not reconnected
+    automatically.
+    """
+    def __init__(self, timeout: float = 1.0):
+        """
+        Args:
+            timeout (float): Maximum seconds to block between keepalive checks
+        """
+        self.timeout = timeout
+        self._clients: list = []
+        self._removed: list = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        
+        # Selector state is only touched by the loop thread
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._registered: Dict[Any, int] = {}
+        self._reset_selector()
+
+    def add(self, client: mqtt.Client):
+        """
+        Register a connected client with the loop
+        """
+        # With a write callback set, paho queues packets instead of
+        # calling loop_write() on the publishing thread
+        client.on_socket_register_write = self._on_register_write
+        client.on_socket_unregister_write = self._on_unregister_write
+        with self._lock:
+            if client not in self._clients:
+                self._clients.append(client)
+            if client in self._removed:
+                self._removed.remove(client)
+        self._wake()
+
+    def remove(self, client: mqtt.Client):
+        """
+        Stop servicing a client once its queued packets are written
+        """
+        with self._lock:
+            if client not in self._clients:
+                return
+            self._clients.remove(client)
+            if self._running:
+                self._removed.append(client)
+                client = None
+        if client is None:
+            self._wake()
+        else:
+            self._release(client)
+
+    def start(self):
+        """
+        Start the shared network thread
+        """
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='mqtt-network-loop', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the shared network thread
+        """
+        if self._thread is None:
+            return
+        self._running = False
+        self._wake()
+        self._thread.join()
+        self._thread = None
+        
+        # Hand remaining clients back to inline writes
+        with self._lock:
+            released = self._removed + self._clients
+            self._removed = []
+            self._clients = []
+        for client in released:
+            self._release(client)
+
+    def _wake(self):
+        """
+        Interrupt the loop's select() call
+        """
+        try:
+            self._wake_w.send(b'\0')
+        except OSError:
+            pass
+
+    def _on_register_write(self, client, userdata, sock):
+        """
+        paho callback: the client has packets queued for writing
+        """
+        self._wake()
+
+    def _on_unregister_write(self, client, userdata, sock):
+        """
+        paho callback: the client's write queue is empty, want_write() covers it
+        """
+
+    def _release(self, client: mqtt.Client):
+        """
+        Write what a client still has queued and stop intercepting its writes
+        """
+        if client.socket() is not None and client.want_write():
+            client.loop_write()
+        client.on_socket_register_write = None
+        client.on_socket_unregister_write = None
+
+    def _call(self, client: mqtt.Client, handler):
+        """
+        Run one of a client's I/O handlers so that its failure, such as a
+        user callback exception re-raised by paho, cannot stop the loop
+        """
+        try:
+            handler()
+        except Exception:
+            _LOGGER.exception("Network loop error in MQTT client")
+
+    def _reset_selector(self):
+        """
+        Start over with a selector watching only the wake-up socket
+        """
+        if self._selector is not None:
+            self._selector.close()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._registered = {}
+
+    def _sync_selector(self, clients: list):
+        """
+        Register the current client sockets with the selector, watching
+        for writes only while a client has packets queued
+        """
+        current = {}
+        for client in clients:
+            sock = client.socket()
+            if sock is None:
+                continue
+            events = selectors.EVENT_READ
+            if client.want_write():
+                events |= selectors.EVENT_WRITE
+            current[sock] = (client, events)
+        
+        # Drop closed or removed sockets first so a reused fd can register
+        for sock in list(self._registered):
+            if sock not in current:
+                try:
+                    self._selector.unregister(sock)
+                except (KeyError, ValueError):
+                    pass
+                del self._registered[sock]
+        
+        for sock, (client, events) in current.items():
+            previous = self._registered.get(sock)
+            if previous is None:
+                self._selector.register(sock, events, client)
+            elif previous != events:
+                self._selector.modify(sock, events, client)
+            self._registered[sock] = events
+
+    def _run(self):
+        """
+        Wait on all client sockets and dispatch paho's I/O handlers
+        """
+        while self._running:
+            with self._lock:
+                clients = list(self._clients)
+                removed = self._removed
+                self._removed = []
+            
+            for client in removed:
+                self._call(client, functools.partial(self._release, client))
+            
+            try:
+                self._sync_selector(clients)
+                ready = self._selector.select(self.timeout)
+            except (OSError, ValueError, KeyError):
+                # A socket was closed or its fd reused under us
+                self._reset_selector()
+                continue
+            
+            for key, events in ready:
+                client = key.data
+                if client is None:
+                    try:
+                        while self._wake_r.recv(256):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                if events & selectors.EVENT_READ:
+                    self._call(client, client.loop_read)
+                if events & selectors.EVENT_WRITE:
+                    self._call(client, client.loop_write)
+            for client in clients:
+                self._call(client, client.loop_misc)
+
 class AdvancedMQTTManager:
     def __init__(self, 
                  broker: str = 'localhost', 
                  port: int = 1883, 
                  client_id: Optional[str] = None,
                  username: Optional[str] = None, 
-                 password: Optional[str] = None):
+                 password: Optional[str] = None,
+                 network_loop: Optional[SharedNetworkLoop] = None,
+                 queue_size: int = 4096):
         """
         Advanced MQTT Client with comprehensive features
         
@@ -22,13 +446,16 @@ class AdvancedMQTTManager:
             client_id (str, optional): Unique client identifier
             username (str, optional): Broker authentication username
             password (str, optional): Broker authentication password
+            network_loop (SharedNetworkLoop, optional): Shared I/O thread to
+                use instead of a dedicated loop_start() thread
+            queue_size (int): Minimum messages retained per topic before the
+                oldest are dropped (the ring is rounded up to a power of two)
+        
+        Raises:
+            ValueError: If queue_size is less than 1
         """
-        # Logging configuration
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s: %(message)s'
-        )
-        self.logger = logging.getLogger(__name__)
+        # Shared module logger
+        self.logger = _LOGGER
 
         # Connection parameters
         self.broker = broker
@@ -38,11 +465,13 @@ class AdvancedMQTTManager:
         # Authentication setup
         self.username = username
         self.password = password
+        self.network_loop = network_loop
         
         # Create MQTT client
         self.client = mqtt.Client(
             client_id=self.client_id, 
-            callback_api_version=mqtt.CallbackAPIVersion.VERSION2
+            callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+            protocol=mqtt.MQTTv5
         )
         
         # Set authentication if provided
@@ -51,115 +480,435 @@ class AdvancedMQTTManager:
         
         # Callback configurations
         self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
         self.client.on_message = self._on_message
         self.client.on_publish = self._on_publish
         
         # Message management
-        self.message_store: Dict[str, list] = {}
-        self.message_lock = threading.Lock()
+        # One ring slot always stays free, so size for queue_size + 1
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        ring_capacity = 1 << queue_size.bit_length()
+        self.message_store: Dict[str, TopicRing] = defaultdict(lambda: TopicRing(ring_capacity))
+        
+        # Serialization and publishing run on one worker, in call order
+        # The worker thread starts on first use and is shut down by disconnect()
+        self._executor: Optional[ThreadPoolExecutor] = self._new_executor()
+        self._publish_slots = threading.BoundedSemaphore(PUBLISH_QUEUE_SIZE)
+        
+        # Pending batches keyed by (topic, qos)
+        self._batches: Dict[tuple, list] = defaultdict(list)
+        self._batch_lock = threading.Lock()
+        self._batch_timer: Optional[threading.Timer] = None
         
         # Connection status
         self.is_connected = False
+        self._connected_evt = threading.Event()
+        self._connect_rc = None
+        
+        # MQTT 5 topic aliases, valid for the current connection only
+        self._topic_aliases: Dict[str, int] = {}
+        self._topic_alias_max = 0
+        self._alias_lock = threading.Lock()
+    
+    def connect(self, timeout: float = 10.0):
+        """
+        Connect to the broker and start the network loop
+        
+        Args:
+            timeout (float): Seconds to wait for the broker's CONNACK
+        
+        Raises:
+            ConnectionError: If the broker rejects or does not answer in time
+        """
+        self._connected_evt.clear()
+        self._connect_rc = None
+        if self._executor is None:
+            self._executor = self._new_executor()
+        self.client.connect(self.broker, self.port)
+        if self.network_loop is not None:
+            self.network_loop.add(self.client)
+        else:
+            self.client.loop_start()
+        
+        if not self._connected_evt.wait(timeout):
+            error = "Connection timeout"
+        elif self._connect_rc != 0:
+            error = f"Connection failed: {self._connect_rc}"
+        else:
+            return
+        
+        # Stop the loop so paho does not keep reconnecting behind our back
+        self.client.disconnect()
+        self._stop_loop()
+        raise ConnectionError(error)
+    
+    def disconnect(self):
+        """
+        Disconnect from the broker and stop the network loop
+        
+        Pending batches and queued publications are sent first.
+        """
+        self.flush_batches()
+        self._executor.submit(self.client.disconnect).result()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._stop_loop()
+        self.is_connected = False
+    
+    @staticmethod
+    def _new_executor() -> ThreadPoolExecutor:
+        """
+        Create the single-worker publish executor
+        """
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix='mqtt-publish')
+    
+    def _stop_loop(self):
+        """
+        Stop servicing the client's socket
+        """
+        if self.network_loop is not None:
+            self.network_loop.remove(self.client)
+        else:
+            self.client.loop_stop()
     
     def _on_connect(self, client, userdata, flags, rc, properties=None):
         """
         Enhanced connection callback with detailed logging
         """
-        if rc == 0:
-            self.is_connected = True
-            self.logger.info(f"Connected to MQTT Broker: {self.broker}")
-            
-            # Auto-subscribe to system topics
-            self.client.subscribe("system/status")
-            self.client.subscribe("system/config")
-        else:
-            error_messages = {
-                1: "Incorrect protocol version",
-                2: "Invalid client identifier",
-                3: "Server unavailable",
-                4: "Bad username or password",
-                5: "Not authorized"
-            }
-            self.logger.error(f"Connection failed: {error_messages.get(rc, 'Unknown error')}")
+        try:
+            self._connect_rc = rc
+            if not rc.is_failure:
+                self.is_connected = True
+                with self._alias_lock:
+                    self._topic_aliases = {}
+                    self._topic_alias_max = getattr(properties, 'TopicAliasMaximum', 0)
+                self.logger.info(f"Connected to MQTT Broker: {self.broker}")
+                
+                # Auto-subscribe to system topics
+                self.client.subscribe("system/status")
+                self.client.subscribe("system/config")
+            else:
+                self.is_connected = False
+                self.logger.error(f"Connection failed: {rc}")
+        finally:
+            # Wake up connect() on success and failure alike
+            self._connected_evt.set()
+    
+    def _on_disconnect(self, client, userdata, flags, rc, properties=None):
+        """
+        Disconnection callback, forgets connection-scoped state
+        """
+        self.is_connected = False
+        
+        # A reconnect may publish before its CONNACK arrives, so no alias
+        # may be assumed until the new broker limit is known
+        with self._alias_lock:
+            self._topic_aliases = {}
+            self._topic_alias_max = 0
+        
+        if rc.is_failure:
+            self.logger.warning(f"Disconnected from MQTT Broker: {rc}")
     
     def _on_message(self, client, userdata, message, properties=None):
         """
         Advanced message handling with storage and processing
         """
         try:
-            # Decode and parse payload
-            payload = message.payload.decode('utf-8')
-            try:
-                parsed_payload = json.loads(payload)
-            except json.JSONDecodeError:
-                parsed_payload = payload
+            # Only attempt JSON when the first significant byte allows it
+            payload = message.payload
+            size = len(payload)
+            i = 0
+            while i < size and payload[i] in _JSON_WHITESPACE:
+                i += 1
+            
+            if i < size and payload[i] in _JSON_LEAD:
+                try:
+                    parsed_payload = orjson.loads(payload)
+                except orjson.JSONDecodeError:
+                    parsed_payload = _decode_text(payload)
+            else:
+                parsed_payload = _decode_text(payload)
             
-            # Thread-safe message storage
-            with self.message_lock:
-                if message.topic not in self.message_store:
-                    self.message_store[message.topic] = []
-                self.message_store[message.topic].append({
-                    'payload': parsed_payload,
-                    'timestamp': time.time()
-                })
+            # Lock-free storage, paho's network thread is the sole producer
+            self.message_store[message.topic].push(parsed_payload, time.time())
             
-            self.logger.info(f"Received on {message.topic}: {parsed_payload}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Received on %s: %r", message.topic, parsed_payload)
         
         except Exception as e:
             self.logger.error(f"Message processing error: {e}")
     
+    def _on_publish(self, client, userdata, mid, rc=None, properties=None):
+        """
+        Publish acknowledgement callback
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Publish %s acknowledged", mid)
+    
+    def _submit(self, fn, *args) -> Future:
+        """
+        Queue work on the publish worker, logging failures nobody waits on
+        
+        Blocks while PUBLISH_QUEUE_SIZE items are waiting for the worker.
+        This only bounds the worker's own queue: once handed to paho,
+        packets are buffered by the client without limit.
+        
+        Raises:
+            RuntimeError: After disconnect(), until connect() is called again
+        """
+        if self._executor is None:
+            raise RuntimeError("Publisher is closed, call connect() first")
+        self._publish_slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._publish_slots.release()
+            raise
+        future.add_done_callback(self._publish_done)
+        return future
+    
+    def _publish_done(self, future: Future):
+        """
+        Done-callback freeing a queue slot and reporting exceptions
+        raised on the publish worker
+        """
+        self._publish_slots.release()
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Publish error: {future.exception()}")
+    
     def publish(self, 
                 topic: str, 
                 message: Any, 
                 qos: int = 1, 
-                retain: bool = False):
+                retain: bool = False) -> Future:
         """
         Enhanced message publishing with multiple options
         
+        Dicts and lists are sent as JSON, bytes as-is and anything else as
+        its UTF-8 string form. Callers with a known payload type can use
+        publish_json or publish_bytes directly.
+        
+        Binary payloads are copied before returning. Dicts and lists are
+        serialized later on the publish worker, so they must not be
+        modified after being handed over.
+        
         Args:
             topic (str): MQTT topic
             message (Any): Message to publish
             qos (int): Quality of Service level (0, 1, 2)
             retain (bool): Retain message on broker
+        
+        Returns:
+            Future: Resolves to the mqtt.MQTTMessageInfo, or raises
+            ValueError on an invalid topic or QoS and TypeError if the
+            message cannot be serialized
         """
-        try:
-            # Convert to JSON if dictionary
-            if isinstance(message, dict):
-                message = json.dumps(message)
+        encode = _PUBLISH_ENCODERS.get(type(message), _encode_other)
+        if encode is bytes:
+            return self.publish_bytes(topic, message, qos, retain)
+        return self._submit(self._encode_and_publish, encode, topic, message, qos, retain)
+    
+    def publish_json(self, 
+                     topic: str, 
+                     obj: Any, 
+                     qos: int = 1, 
+                     retain: bool = False) -> Future:
+        """
+        Publish a JSON-serializable object
+        
+        Serialization and the hand-off to paho happen on a background
+        worker, so this returns immediately. The object must not be
+        modified until the returned future completes.
+        
+        Args:
+            topic (str): MQTT topic
+            obj (Any): Object to serialize with orjson
+            qos (int): Quality of Service level (0, 1, 2)
+            retain (bool): Retain message on broker
+        
+        Returns:
+            Future: Resolves to the mqtt.MQTTMessageInfo
+        """
+        return self._submit(self._encode_and_publish, _dumps_json, topic, obj, qos, retain)
+    
+    def publish_bytes(self, 
+                      topic: str, 
+                      payload: bytes, 
+                      qos: int = 1, 
+                      retain: bool = False) -> Future:
+        """
+        Publish an already encoded payload
+        
+        Mutable buffers such as bytearray are copied before returning.
+        
+        Args:
+            topic (str): MQTT topic
+            payload (bytes): Encoded payload
+            qos (int): Quality of Service level (0, 1, 2)
+            retain (bool): Retain message on broker
+        
+        Returns:
+            Future: Resolves to the mqtt.MQTTMessageInfo
+        """
+        return self._submit(self._publish_now, topic, bytes(payload), qos, retain)
+    
+    def _encode_and_publish(self, encode, topic: str, message: Any, qos: int, retain: bool):
+        """
+        Encode and publish a message on the publish worker
+        """
+        return self._publish_now(topic, encode(message), qos, retain)
+    
+    def _publish_now(self, topic: str, payload: bytes, qos: int, retain: bool):
+        """
+        Publish an encoded payload on the publish worker
+        """
+        result = self.client.publish(
+            topic=topic, 
+            payload=payload, 
+            qos=qos, 
+            retain=retain
+        )
+        
+        # Check publication status
+        if result.rc != mqtt.MQTT_ERR_SUCCESS:
+            self.logger.warning(f"Publication to {topic} failed")
+        elif self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Published to %s", topic)
+        return result
+    
+    def publish_batch(self, 
+                      topic: str, 
+                      payloads: list, 
+                      qos: int = 1, 
+                      retain: bool = False):
+        """
+        Publish several pre-encoded payloads as MQTT 5 batch PUBLISH packets
+        
+        Each payload is prefixed with its varint length and tagged with
+        batch-format/batch-size user properties. At most BATCH_MAX_SIZE
+        payloads go into a single packet. For QoS 0, when the broker allows
+        topic aliases, the topic name is only sent with the first packet.
+        
+        Args:
+            topic (str): MQTT topic
+            payloads (list): Encoded payloads (bytes)
+            qos (int): Quality of Service level (0, 1, 2)
+            retain (bool): Retain message on broker
+        """
+        for start in range(0, len(payloads), BATCH_MAX_SIZE):
+            chunk = payloads[start:start + BATCH_MAX_SIZE]
+            frame = b''.join(encode_varint(len(sub)) + sub for sub in chunk)
             
-            # Publish with enhanced parameters
-            result = self.client.publish(
-                topic=topic, 
-                payload=str(message), 
-                qos=qos, 
-                retain=retain
-            )
+            properties = Properties(PacketTypes.PUBLISH)
+            properties.UserProperty = [
+                ('batch-format', 'v1'),
+                ('batch-size', str(len(chunk)))
+            ]
             
-            # Check publication status
-            if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                self.logger.info(f"Published to {topic}")
-            else:
-                self.logger.warning(f"Publication to {topic} failed")
+            # Hold the alias lock so the aliased topic is registered
+            # with the broker before any alias-only packet is queued
+            with self._alias_lock:
+                send_topic, new_alias = self._apply_topic_alias(topic, qos, properties)
+                result = self.client.publish(
+                    topic=send_topic, 
+                    payload=frame, 
+                    qos=qos, 
+                    retain=retain, 
+                    properties=properties
+                )
+                if new_alias is not None and result.rc == mqtt.MQTT_ERR_SUCCESS:
+                    self._topic_aliases[topic] = new_alias
+            if result.rc != mqtt.MQTT_ERR_SUCCESS:
+                self.logger.warning(f"Batch publication to {topic} failed")
+    
+    def _apply_topic_alias(self, topic: str, qos: int, properties: Properties) -> tuple:
+        """
+        Set the TopicAlias property for a topic
         
-        except Exception as e:
-            self.logger.error(f"Publish error on {topic}: {e}")
+        Only QoS 0 packets use aliases: paho resends QoS 1/2 packets
+        verbatim after a reconnect, when the broker no longer knows the
+        alias.
+        
+        Returns:
+            tuple: Topic name to send, empty once the alias is known to the
+            broker, and a newly assigned alias to record if the publish
+            succeeds, or None
+        """
+        if qos != 0:
+            return topic, None
+        
+        alias = self._topic_aliases.get(topic)
+        if alias is not None:
+            properties.TopicAlias = alias
+            return '', None
+        
+        if len(self._topic_aliases) < self._topic_alias_max:
+            alias = len(self._topic_aliases) + 1
+            properties.TopicAlias = alias
+            return topic, alias
+        return topic, None
+    
+    def batch(self, topic: str, payload: bytes, qos: int = 1):
+        """
+        Queue a payload for batched publishing
+        
+        The batch is sent once it reaches BATCH_MAX_SIZE payloads or
+        BATCH_MAX_DELAY seconds after its first payload, whichever is first.
+        
+        Args:
+            topic (str): MQTT topic
+            payload (bytes): Encoded payload
+            qos (int): Quality of Service level (0, 1, 2)
+        """
+        full = None
+        with self._batch_lock:
+            key = (topic, qos)
+            pending = self._batches[key]
+            pending.append(payload)
+            
+            if len(pending) >= BATCH_MAX_SIZE:
+                full = self._batches.pop(key)
+            elif self._batch_timer is None:
+                self._batch_timer = threading.Timer(BATCH_MAX_DELAY, self.flush_batches)
+                self._batch_timer.daemon = True
+                self._batch_timer.start()
+        
+        if full:
+            self._submit(self.publish_batch, topic, full, qos)
+    
+    def flush_batches(self):
+        """
+        Queue all pending batches for publishing immediately
+        """
+        with self._batch_lock:
+            batches = self._batches
+            self._batches = defaultdict(list)
+            if self._batch_timer is not None:
+                self._batch_timer.cancel()
+                self._batch_timer = None
+        
+        for (topic, qos), payloads in batches.items():
+            self._submit(self.publish_batch, topic, payloads, qos)
     
     def get_messages(self, topic: str, clear: bool = True) -> list:
         """
         Retrieve and optionally clear messages for a topic
         
+        Each topic's ring is lock-free with a single consumer, so drain a
+        given topic from one thread at a time.
+        
         Args:
             topic (str): Topic to retrieve messages from
             clear (bool): Clear messages after retrieval
         
         Returns:
-            list: Messages received on the topic
+            list: (payload, timestamp) pairs received on the topic
         """
-        with self.message_lock:
-            messages = self.message_store.get(topic, [])
-            if clear:
-                self.message_store[topic] = []
-            return messages
+        ring = self.message_store.get(topic)
+        if ring is None:
+            return []
+        return ring.drain(clear)
 
 def simulate_advanced_sensor_network():
     """
@@ -173,49 +922,50 @@ def simulate_advanced_sensor_network():
     )
     
     # Connection and loop start
-    mqtt_client.client.connect(mqtt_client.broker, mqtt_client.port)
-    mqtt_client.client.loop_start()
+    mqtt_client.connect()
     
-    # Sensor configurations
+    # Sensor configurations, batched onto a common parent topic
+    batch_topic = 'sensors/climate'
     sensors = {
         'temperature': {
-            'topic': 'sensors/climate/temperature',
-            'range': (20, 30),
-            'unit': '°C'
+            'range': (20, 30)
         },
         'humidity': {
-            'topic': 'sensors/climate/humidity',
-            'range': (40, 60),
-            'unit': '%'
+            'range': (40, 60)
         },
         'pressure': {
-            'topic': 'sensors/climate/pressure',
-            'range': (990, 1010),
-            'unit': 'hPa'
+            'range': (990, 1010)
         }
     }
     
+    # Flatten configuration once: (sensor id, low, high)
+    readings = tuple(
+        (SENSOR_IDS[sensor], *config['range'])
+        for sensor, config in sensors.items()
+    )
+    
+    # Reusable packing buffer and bound methods for the hot loop
+    buf = bytearray(READING_STRUCT.size)
+    pack_into = READING_STRUCT.pack_into
+    uniform = random.Random().uniform
+    batch = mqtt_client.batch
+    flush_batches = mqtt_client.flush_batches
+    
     try:
         while True:
-            for sensor, config in sensors.items():
+            now = time.time()
+            for sensor_id, low, high in readings:
                 # Generate sensor data
-                value = round(random.uniform(config['range'][0], config['range'][1]), 2)
+                value = round(uniform(low, high), 2)
                 
-                # Create comprehensive payload
-                payload = {
-                    'sensor': sensor,
-                    'value': value,
-                    'unit': config['unit'],
-                    'timestamp': time.time(),
-                    'device_id': f'sensor_{sensor}'
-                }
+                # Pack fixed-layout binary payload
+                pack_into(buf, 0, sensor_id, value, now)
                 
-                # Publish with variable QoS
-                mqtt_client.publish(
-                    topic=config['topic'], 
-                    message=payload, 
-                    qos=random.choice([0, 1, 2])
-                )
+                # Queue for batch publishing, telemetry is fire-and-forget
+                batch(batch_topic, bytes(buf), 0)
+            
+            # Send this tick's readings without waiting for the batch timer
+            flush_batches()
             
             # Wait between sensor readings
             time.sleep(5)
@@ -223,7 +973,7 @@ def simulate_advanced_sensor_network():
     except KeyboardInterrupt:
         print("Stopping sensor simulation...")
     finally:
-        mqtt_client.client.loop_stop()
+        mqtt_client.disconnect()
 
 def main():
     # Run sensor simulation
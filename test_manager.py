@@ -0,0 +1,184 @@
+import threading
+from collections import OrderedDict
+
+import pytest
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.reasoncodes import ReasonCode
+
+from MQTT import AdvancedMQTTManager
+
+
+@pytest.fixture
+def manager():
+    mgr = AdvancedMQTTManager(client_id='test-client')
+    mgr.calls = []
+    mgr.client.subscribe = lambda topic: mgr.calls.append(('subscribe', topic))
+    mgr.client.disconnect = lambda: mgr.calls.append(('disconnect',))
+    mgr.client.loop_stop = lambda: mgr.calls.append(('loop_stop',))
+    return mgr
+
+
+def test_on_connect_failure_sets_event(manager):
+    rc = ReasonCode(PacketTypes.CONNACK, identifier=134)
+    manager._on_connect(manager.client, None, {}, rc, None)
+    assert manager._connected_evt.is_set()
+    assert not manager.is_connected
+    assert manager._connect_rc == rc
+
+
+def test_on_connect_success_subscribes(manager):
+    rc = ReasonCode(PacketTypes.CONNACK, 'Success')
+    manager._on_connect(manager.client, None, {}, rc, None)
+    assert manager._connected_evt.is_set()
+    assert manager.is_connected
+    assert ('subscribe', 'system/status') in manager.calls
+
+
+def test_connect_rejected_raises_and_stops_loop(manager):
+    rc = ReasonCode(PacketTypes.CONNACK, identifier=134)
+    manager.client.connect = lambda host, port: None
+    manager.client.loop_start = lambda: manager._on_connect(manager.client, None, {}, rc, None)
+    with pytest.raises(ConnectionError, match='Bad user name or password'):
+        manager.connect(timeout=1)
+    assert manager.calls == [('disconnect',), ('loop_stop',)]
+
+
+def test_connect_timeout_stops_loop(manager):
+    manager.client.connect = lambda host, port: None
+    manager.client.loop_start = lambda: None
+    with pytest.raises(ConnectionError, match='timeout'):
+        manager.connect(timeout=0.01)
+    assert manager.calls == [('disconnect',), ('loop_stop',)]
+
+
+class FakeInfo:
+    rc = 0
+
+
+def test_disconnect_resets_topic_aliases(manager):
+    sent = []
+    manager.client.publish = lambda **kwargs: (sent.append(kwargs), FakeInfo())[1]
+    manager._topic_alias_max = 4
+    manager.publish_batch('sensors/climate', [b'a'], qos=0)
+    manager.publish_batch('sensors/climate', [b'b'], qos=0)
+    assert [kw['topic'] for kw in sent] == ['sensors/climate', '']
+
+    rc = ReasonCode(PacketTypes.DISCONNECT, identifier=0)
+    manager._on_disconnect(manager.client, None, None, rc, None)
+    manager.publish_batch('sensors/climate', [b'c'], qos=0)
+    assert sent[-1]['topic'] == 'sensors/climate'
+    assert not hasattr(sent[-1]['properties'], 'TopicAlias')
+
+
+@pytest.mark.parametrize('queue_size', [1, 3, 4096])
+def test_queue_size_messages_are_retained(queue_size):
+    manager = AdvancedMQTTManager(queue_size=queue_size)
+    ring = manager.message_store['t']
+    for i in range(queue_size + 5):
+        ring.push(i, 0.0)
+    payloads = [payload for payload, _ in manager.get_messages('t')]
+    assert len(payloads) >= queue_size
+    assert payloads[-1] == queue_size + 4
+
+
+@pytest.mark.parametrize('queue_size', [0, -1])
+def test_queue_size_must_be_positive(queue_size):
+    with pytest.raises(ValueError):
+        AdvancedMQTTManager(queue_size=queue_size)
+
+
+def test_disconnect_shuts_down_publish_worker(manager):
+    workers = []
+    manager.client.publish = lambda **kwargs: (workers.append(threading.current_thread()), FakeInfo())[1]
+    manager.publish('t', 'hello').result()
+    assert workers[0].is_alive()
+
+    manager.disconnect()
+    assert not workers[0].is_alive()
+    with pytest.raises(RuntimeError):
+        manager.publish('t', 'hello')
+
+    rc = ReasonCode(PacketTypes.CONNACK, 'Success')
+    manager.client.connect = lambda host, port: None
+    manager.client.loop_start = lambda: manager._on_connect(manager.client, None, {}, rc, None)
+    manager.connect(timeout=1)
+    assert manager.publish('t', 'again').result().rc == 0
+
+
+class FakeMessage:
+    def __init__(self, payload, topic='t'):
+        self.payload = payload
+        self.topic = topic
+
+
+@pytest.mark.parametrize('payload, expected', [
+    (b'{"a": 1}', {'a': 1}),
+    (b' \n[1, 2]', [1, 2]),
+    (b'null', None),
+    (b'-2.5', -2.5),
+    (b'hello', 'hello'),
+    (b'123abc', '123abc'),
+    (b'', ''),
+    (b'\x11\xff\x00', b'\x11\xff\x00'),
+])
+def test_on_message_decodes_payload(manager, payload, expected):
+    manager._on_message(manager.client, None, FakeMessage(payload))
+    [(parsed, _)] = manager.get_messages('t')
+    assert parsed == expected
+    assert type(parsed) is type(expected)
+
+
+@pytest.fixture
+def sent(manager):
+    payloads = []
+    manager.client.publish = lambda **kwargs: (payloads.append(kwargs['payload']), FakeInfo())[1]
+    return payloads
+
+
+class MyBytes(bytes):
+    pass
+
+
+class MyList(list):
+    pass
+
+
+@pytest.mark.parametrize('message, expected', [
+    ({'a': 1}, b'{"a":1}'),
+    ([1, 'x'], b'[1,"x"]'),
+    (b'raw', b'raw'),
+    (bytearray(b'buf'), b'buf'),
+    ('héllo', 'héllo'.encode('utf-8')),
+    (42, b'42'),
+    (OrderedDict(a=1), b'{"a":1}'),
+    (MyList([1]), b'[1]'),
+    (MyBytes(b'sub'), b'sub'),
+])
+def test_publish_encodes_by_type(manager, sent, message, expected):
+    manager.publish('t', message).result()
+    assert sent == [expected]
+    assert type(sent[0]) is bytes
+
+
+def test_publish_copies_bytearray_before_returning(manager, sent):
+    release = threading.Event()
+    publish = manager.client.publish
+    manager.client.publish = lambda **kwargs: (release.wait(), publish(**kwargs))[1]
+
+    buf = bytearray(b'abc')
+    future = manager.publish('t', buf)
+    buf[0] = ord('X')
+    release.set()
+    future.result()
+    assert sent == [b'abc']
+
+
+@pytest.mark.parametrize('send', ['publish', 'publish_json'])
+@pytest.mark.parametrize('message, expected', [
+    ({1: 'a'}, b'{"1":"a"}'),
+    ([{2: 3}], b'[{"2":3}]'),
+    (OrderedDict([(1.5, 'x')]), b'{"1.5":"x"}'),
+])
+def test_publish_json_accepts_non_str_keys(manager, sent, send, message, expected):
+    getattr(manager, send)('t', message).result()
+    assert sent == [expected]
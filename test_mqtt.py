@@ -0,0 +1,58 @@
+import pytest
+
+from MQTT import (
+    READING_STRUCT,
+    decode_batch,
+    encode_varint,
+    unpack_reading
+)
+
+
+@pytest.mark.parametrize('value, encoded', [
+    (0, b'\x00'),
+    (127, b'\x7f'),
+    (128, b'\x80\x01'),
+    (16383, b'\xff\x7f'),
+    (16384, b'\x80\x80\x01'),
+    (268435455, b'\xff\xff\xff\x7f'),
+])
+def test_encode_varint(value, encoded):
+    assert encode_varint(value) == encoded
+
+
+def _frame(payloads):
+    return b''.join(encode_varint(len(sub)) + sub for sub in payloads)
+
+
+@pytest.mark.parametrize('payloads', [
+    [],
+    [b''],
+    [b'a', b'', b'bc'],
+    [b'x' * 127, b'y' * 128, b'z' * 20000],
+])
+def test_decode_batch_round_trip(payloads):
+    assert decode_batch(_frame(payloads)) == payloads
+
+
+def test_decode_batch_readings():
+    readings = [READING_STRUCT.pack(i, i + 0.5, 1700000000.0 + i) for i in range(3)]
+    decoded = [unpack_reading(sub) for sub in decode_batch(_frame(readings))]
+    assert [r['sensor_id'] for r in decoded] == [0, 1, 2]
+    assert [r['value'] for r in decoded] == [0.5, 1.5, 2.5]
+
+
+def test_decode_batch_truncated_payload():
+    frame = _frame([b'abc', b'defgh'])
+    with pytest.raises(ValueError):
+        decode_batch(frame[:-1])
+
+
+def test_decode_batch_truncated_length_prefix():
+    frame = _frame([b'abc', b'y' * 200])
+    with pytest.raises(ValueError):
+        decode_batch(frame[:5])
+
+
+def test_decode_batch_overlong_length_prefix():
+    with pytest.raises(ValueError):
+        decode_batch(b'\xff\xff\xff\xff\x01')
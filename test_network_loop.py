@@ -0,0 +1,143 @@
+import socket
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+import pytest
+
+from MQTT import SharedNetworkLoop
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class FakeClient:
+    """
+    Minimal stand-in for the paho client's external loop interface
+    """
+    def __init__(self, fail_read=False):
+        self.sock, self.peer = socket.socketpair()
+        self.fail_read = fail_read
+        self.reads = 0
+        self.writes = []
+        self.misc = 0
+        self.pending_write = False
+        self.on_socket_register_write = None
+        self.on_socket_unregister_write = None
+
+    def socket(self):
+        return self.sock
+
+    def want_write(self):
+        return self.pending_write
+
+    def loop_read(self):
+        self.sock.recv(256)
+        self.reads += 1
+        if self.fail_read:
+            raise RuntimeError("callback failed")
+
+    def loop_write(self):
+        self.writes.append(threading.current_thread().name)
+        self.pending_write = False
+
+    def loop_misc(self):
+        self.misc += 1
+
+
+@pytest.fixture
+def network_loop():
+    loop = SharedNetworkLoop(timeout=0.05)
+    loop.start()
+    yield loop
+    loop.stop()
+
+
+def test_add_installs_and_remove_releases_write_callbacks():
+    loop = SharedNetworkLoop()
+    client = FakeClient()
+    loop.add(client)
+    assert client.on_socket_register_write is not None
+    client.pending_write = True
+    loop.remove(client)
+    assert client.on_socket_register_write is None
+    assert client.on_socket_unregister_write is None
+    assert client.writes == [threading.current_thread().name]
+
+
+def test_remove_while_running_flushes_on_loop_thread(network_loop):
+    client = FakeClient()
+    network_loop.add(client)
+    assert _wait_for(lambda: client.misc > 0)
+    client.pending_write = True
+    network_loop.remove(client)
+    assert _wait_for(lambda: client.on_socket_register_write is None)
+    assert client.writes == ['mqtt-network-loop']
+
+
+def test_client_error_does_not_stop_loop(network_loop):
+    failing = FakeClient(fail_read=True)
+    healthy = FakeClient()
+    network_loop.add(failing)
+    network_loop.add(healthy)
+
+    failing.peer.send(b'x')
+    assert _wait_for(lambda: failing.reads == 1)
+    healthy.peer.send(b'y')
+    assert _wait_for(lambda: healthy.reads == 1)
+    assert network_loop._thread.is_alive()
+
+
+def _fake_broker(server, received):
+    conn, _ = server.accept()
+    conn.recv(4096)
+    # MQTT 5 CONNACK: success, no properties
+    conn.sendall(bytes([0x20, 3, 0, 0, 0]))
+    while True:
+        data = conn.recv(65536)
+        if not data:
+            break
+        received.append(data)
+    conn.close()
+
+
+def test_publishes_are_written_by_loop_thread(network_loop):
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    received = []
+    threading.Thread(target=_fake_broker, args=(server, received), daemon=True).start()
+
+    client = mqtt.Client(
+        callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+        protocol=mqtt.MQTTv5
+    )
+    client.connect('127.0.0.1', server.getsockname()[1])
+    network_loop.add(client)
+
+    writers = []
+    loop_write = client.loop_write
+    def recording_loop_write():
+        writers.append(threading.current_thread().name)
+        return loop_write()
+    client.loop_write = recording_loop_write
+
+    publisher = threading.Thread(
+        target=lambda: [client.publish('t', b'x' * 100) for _ in range(20)],
+        name='publisher'
+    )
+    publisher.start()
+    publisher.join()
+
+    assert _wait_for(lambda: sum(map(len, received)) >= 20 * 100)
+    assert set(writers) == {'mqtt-network-loop'}
+
+    client.disconnect()
+    network_loop.remove(client)
+    server.close()
@@ -0,0 +1,71 @@
+import pytest
+
+from MQTT import TopicRing
+
+
+def test_topic_ring_rejects_non_power_of_two():
+    with pytest.raises(ValueError):
+        TopicRing(3)
+
+
+def test_topic_ring_drain_in_order():
+    ring = TopicRing(8)
+    for i in range(3):
+        ring.push(i, float(i))
+    assert ring.drain(clear=False) == [(0, 0.0), (1, 1.0), (2, 2.0)]
+    assert ring.drain() == [(0, 0.0), (1, 1.0), (2, 2.0)]
+    assert ring.drain() == []
+    assert ring.dropped == 0
+
+
+def test_topic_ring_overflow_keeps_newest():
+    ring = TopicRing(4)
+    for i in range(10):
+        ring.push(i, float(i))
+    assert ring.drain(clear=False) == [(7, 7.0), (8, 8.0), (9, 9.0)]
+    assert ring.dropped == 0
+    assert ring.drain() == [(7, 7.0), (8, 8.0), (9, 9.0)]
+    assert ring.dropped == 7
+
+
+def test_topic_ring_wraps_after_drain():
+    ring = TopicRing(4)
+    for i in range(3):
+        ring.push(i, float(i))
+    ring.drain()
+    for i in range(3, 6):
+        ring.push(i, float(i))
+    assert ring.drain() == [(3, 3.0), (4, 4.0), (5, 5.0)]
+
+
+def _lap_during_copy(ring, pushes):
+    # Producer pushes between the payload and timestamp copies of a drain
+    class LappingList(list):
+        def __getitem__(self, key):
+            items = list.__getitem__(self, key)
+            ring.payloads = original
+            for value in pushes:
+                ring.push(value, float(value))
+            return items
+
+    original = ring.payloads
+    ring.payloads = LappingList(original)
+
+
+def test_topic_ring_discards_entries_overwritten_during_drain():
+    ring = TopicRing(4)
+    for i in range(3):
+        ring.push(i, float(i))
+    _lap_during_copy(ring, [3, 4])
+    assert ring.drain() == [(2, 2.0)]
+    assert ring.dropped == 2
+
+
+def test_topic_ring_multiple_laps_during_drain_count_each_drop_once():
+    ring = TopicRing(4)
+    for i in range(3):
+        ring.push(i, float(i))
+    _lap_during_copy(ring, range(3, 13))
+    assert ring.drain() == []
+    assert ring.drain() == [(10, 10.0), (11, 11.0), (12, 12.0)]
+    assert ring.dropped == 10